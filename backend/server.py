@@ -1,14 +1,18 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import base64
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime, timedelta
-from bson import ObjectId
+from datetime import datetime, time, timedelta, timezone
+from bson import ObjectId, has_c
+from bson.errors import InvalidId
 
 
 ROOT_DIR = Path(__file__).parent
@@ -16,11 +20,22 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=100,
+    minPoolSize=10,
+    serverSelectionTimeoutMS=2000,
+    # Return aware UTC datetimes so reads serialize with the same +00:00
+    # offset as the datetime.now(timezone.utc) values we write
+    tz_aware=True,
+    tzinfo=timezone.utc,
+)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI()
+# orjson serializes large topic lists (nested dicts + datetimes) far faster
+# than stdlib json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -32,9 +47,87 @@ def serialize_doc(doc):
         return None
     doc['id'] = str(doc['_id'])
     del doc['_id']
+    if isinstance(doc.get('subject_id'), ObjectId):
+        doc['subject_id'] = str(doc['subject_id'])
     return doc
 
 
+# Keyset pagination cursors: opaque base64 of "created_at|_id" of the last
+# item on the previous page (avoids skip's O(N) cost)
+def encode_cursor(created_at, doc_id):
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{doc_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts, _, oid = raw.partition('|')
+        return datetime.fromisoformat(ts), ObjectId(oid)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def cursor_filter(cursor):
+    ts, oid = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": ts}},
+        {"created_at": ts, "_id": {"$lt": oid}}
+    ]}
+
+
+# The UTC day window only changes at midnight, so cache it keyed on the date
+# instead of rebuilding both boundaries on every request. Handlers call this
+# synchronously (no await between check and set), so the single event loop
+# needs no lock here.
+_today_window = None
+
+
+def today_window(now):
+    global _today_window
+    today = now.date()
+    if _today_window is None or _today_window[0] != today:
+        _today_window = (
+            today,
+            datetime.combine(today, time.min, tzinfo=timezone.utc),
+            datetime.combine(today, time.max, tzinfo=timezone.utc)
+        )
+    return _today_window[1], _today_window[2]
+
+
+# Parse ObjectId parameters once via dependencies instead of wrapping every
+# handler in try/except — bad ids fail fast with 422, and real DB errors are
+# no longer masked as 400s
+def parse_object_id(value: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        raise HTTPException(status_code=422, detail=f"Invalid id: {value}")
+
+
+def valid_subject_id(subject_id: str) -> ObjectId:
+    return parse_object_id(subject_id)
+
+
+def valid_topic_id(topic_id: str) -> ObjectId:
+    return parse_object_id(topic_id)
+
+
+# Shape one unwound topic+revision aggregation row into the API response dict
+def revision_row(t, include_created_at=False):
+    row = {
+        "id": str(t['_id']),
+        "topic_name": t['name'],
+        "subject_name": t.get('subject_name', 'Unknown'),
+        "subject_id": str(t['subject_id']),
+        "notes": t['notes'],
+        "day_number": t['revision_dates']['day_number'],
+        "revision_date": t['revision_dates']['date']
+    }
+    if include_created_at:
+        row["created_at"] = t['created_at'].isoformat()
+    return row
+
+
 # Define Models
 class SubjectCreate(BaseModel):
     name: str
@@ -85,7 +178,7 @@ async def root():
 async def create_subject(subject: SubjectCreate):
     subject_dict = {
         "name": subject.name,
-        "created_at": datetime.utcnow()
+        "created_at": datetime.now(timezone.utc)
     }
     result = await db.subjects.insert_one(subject_dict)
     subject_dict['_id'] = result.inserted_id
@@ -99,286 +192,251 @@ async def get_subjects():
 
 
 @api_router.get("/subjects/{subject_id}", response_model=SubjectResponse)
-async def get_subject(subject_id: str):
-    try:
-        subject = await db.subjects.find_one({"_id": ObjectId(subject_id)})
-        if not subject:
-            raise HTTPException(status_code=404, detail="Subject not found")
-        return serialize_doc(subject)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def get_subject(subject_id: ObjectId = Depends(valid_subject_id)):
+    subject = await db.subjects.find_one({"_id": subject_id})
+    if not subject:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    return serialize_doc(subject)
 
 
 @api_router.put("/subjects/{subject_id}", response_model=SubjectResponse)
-async def update_subject(subject_id: str, subject: SubjectUpdate):
-    try:
-        result = await db.subjects.find_one_and_update(
-            {"_id": ObjectId(subject_id)},
-            {"$set": {"name": subject.name}},
-            return_document=True
-        )
-        if not result:
-            raise HTTPException(status_code=404, detail="Subject not found")
-        return serialize_doc(result)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def update_subject(subject: SubjectUpdate, subject_id: ObjectId = Depends(valid_subject_id)):
+    result = await db.subjects.find_one_and_update(
+        {"_id": subject_id},
+        {"$set": {"name": subject.name}},
+        return_document=True
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    # Renames are rare; keep the denormalized copies in sync
+    await db.topics.update_many({"subject_id": subject_id}, {"$set": {"subject_name": subject.name}})
+    return serialize_doc(result)
 
 
 @api_router.delete("/subjects/{subject_id}")
-async def delete_subject(subject_id: str):
-    try:
-        # Delete all topics under this subject
-        await db.topics.delete_many({"subject_id": subject_id})
-        # Delete the subject
-        result = await db.subjects.delete_one({"_id": ObjectId(subject_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Subject not found")
-        return {"message": "Subject deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def delete_subject(subject_id: ObjectId = Depends(valid_subject_id)):
+    # Delete the topics and the subject concurrently — the two operations
+    # are independent, so there's no need to serialize the round-trips
+    _, result = await asyncio.gather(
+        db.topics.delete_many({"subject_id": subject_id}),
+        db.subjects.delete_one({"_id": subject_id})
+    )
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    return {"message": "Subject deleted successfully"}
 
 
 # Topic Endpoints
 @api_router.post("/topics", response_model=TopicResponse)
 async def create_topic(topic: TopicCreate):
-    try:
-        # Verify subject exists
-        subject = await db.subjects.find_one({"_id": ObjectId(topic.subject_id)})
-        if not subject:
-            raise HTTPException(status_code=404, detail="Subject not found")
-        
-        created_at = datetime.utcnow()
-        
-        # Calculate revision dates: Day 2, Day 7, Day 14
-        revision_dates = [
-            {"date": (created_at + timedelta(days=2)).isoformat(), "day_number": 2, "completed": False},
-            {"date": (created_at + timedelta(days=7)).isoformat(), "day_number": 7, "completed": False},
-            {"date": (created_at + timedelta(days=14)).isoformat(), "day_number": 14, "completed": False}
-        ]
-        
-        topic_dict = {
-            "subject_id": topic.subject_id,
-            "name": topic.name,
-            "notes": topic.notes or "",
-            "created_at": created_at,
-            "revision_dates": revision_dates
-        }
-        
-        result = await db.topics.insert_one(topic_dict)
-        topic_dict['_id'] = result.inserted_id
-        topic_dict['subject_name'] = subject['name']
-        
-        return serialize_doc(topic_dict)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
+    # Verify subject exists
+    subject_oid = parse_object_id(topic.subject_id)
+    subject = await db.subjects.find_one({"_id": subject_oid}, projection={"name": 1})
+    if not subject:
+        raise HTTPException(status_code=404, detail="Subject not found")
+
+    created_at = datetime.now(timezone.utc)
+
+    # Calculate revision dates: Day 2, Day 7, Day 14
+    # Stored as native datetimes so Mongo can index and range-filter them
+    revision_dates = [
+        {"date": created_at + timedelta(days=2), "day_number": 2, "completed": False},
+        {"date": created_at + timedelta(days=7), "day_number": 7, "completed": False},
+        {"date": created_at + timedelta(days=14), "day_number": 14, "completed": False}
+    ]
+
+    topic_dict = {
+        "subject_id": subject_oid,
+        "subject_name": subject['name'],
+        "name": topic.name,
+        "notes": topic.notes or "",
+        "created_at": created_at,
+        "revision_dates": revision_dates
+    }
 
-@api_router.get("/topics", response_model=List[TopicResponse])
-async def get_all_topics():
-    topics = await db.topics.find().sort("created_at", -1).to_list(1000)
-    
-    # Batch fetch all subjects to avoid N+1 queries
-    subjects = await db.subjects.find().to_list(None)
-    subjects_dict = {str(s['_id']): s['name'] for s in subjects}
-    
+    result = await db.topics.insert_one(topic_dict)
+    topic_dict['_id'] = result.inserted_id
+
+    return serialize_doc(topic_dict)
+
+
+# response_model omitted on the hot list endpoints: the docs keep the schema
+# via `responses`, but the trusted DB dicts skip per-item pydantic validation
+@api_router.get("/topics", responses={200: {"model": List[TopicResponse]}})
+async def get_all_topics(response: Response, cursor: Optional[str] = None,
+                         limit: int = Query(100, ge=1, le=1000)):
+    # subject_name is denormalized onto the topic docs, so no join is needed
+    pipeline = [
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit},
+        {"$addFields": {"subject_name": {"$ifNull": ["$subject_name", "Unknown"]}}}
+    ]
+    if cursor:
+        pipeline.insert(0, {"$match": cursor_filter(cursor)})
+    topics = await db.topics.aggregate(pipeline).to_list(None)
+    if len(topics) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(topics[-1]['created_at'], topics[-1]['_id'])
+    return [serialize_doc(t) for t in topics]
+
+
+@api_router.get("/subjects/{subject_id}/topics", responses={200: {"model": List[TopicResponse]}})
+async def get_topics_by_subject(response: Response, subject_id: ObjectId = Depends(valid_subject_id),
+                                cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    subject = await db.subjects.find_one({"_id": subject_id}, projection={"name": 1})
+    if not subject:
+        raise HTTPException(status_code=404, detail="Subject not found")
+
+    query = {"subject_id": subject_id}
+    if cursor:
+        query.update(cursor_filter(cursor))
+    topics = await db.topics.find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit).to_list(None)
+    if len(topics) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(topics[-1]['created_at'], topics[-1]['_id'])
     result = []
     for t in topics:
-        t['subject_name'] = subjects_dict.get(t['subject_id'], 'Unknown')
+        t['subject_name'] = subject['name']
         result.append(serialize_doc(t))
     return result
 
 
-@api_router.get("/subjects/{subject_id}/topics", response_model=List[TopicResponse])
-async def get_topics_by_subject(subject_id: str):
-    try:
-        subject = await db.subjects.find_one({"_id": ObjectId(subject_id)})
-        if not subject:
-            raise HTTPException(status_code=404, detail="Subject not found")
-        
-        topics = await db.topics.find({"subject_id": subject_id}).sort("created_at", -1).to_list(1000)
-        result = []
-        for t in topics:
-            t['subject_name'] = subject['name']
-            result.append(serialize_doc(t))
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
 @api_router.get("/topics/{topic_id}", response_model=TopicResponse)
-async def get_topic(topic_id: str):
-    try:
-        topic = await db.topics.find_one({"_id": ObjectId(topic_id)})
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        subject = await db.subjects.find_one({"_id": ObjectId(topic['subject_id'])})
-        topic['subject_name'] = subject['name'] if subject else 'Unknown'
-        return serialize_doc(topic)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def get_topic(topic_id: ObjectId = Depends(valid_topic_id)):
+    topic = await db.topics.find_one({"_id": topic_id})
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+
+    topic.setdefault('subject_name', 'Unknown')
+    return serialize_doc(topic)
 
 
 @api_router.put("/topics/{topic_id}", response_model=TopicResponse)
-async def update_topic(topic_id: str, topic_update: TopicUpdate):
-    try:
-        update_dict = {}
-        if topic_update.name is not None:
-            update_dict['name'] = topic_update.name
-        if topic_update.notes is not None:
-            update_dict['notes'] = topic_update.notes
-        
-        if not update_dict:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = await db.topics.find_one_and_update(
-            {"_id": ObjectId(topic_id)},
-            {"$set": update_dict},
-            return_document=True
-        )
-        
-        if not result:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        subject = await db.subjects.find_one({"_id": ObjectId(result['subject_id'])})
-        result['subject_name'] = subject['name'] if subject else 'Unknown'
-        return serialize_doc(result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def update_topic(topic_update: TopicUpdate, topic_id: ObjectId = Depends(valid_topic_id)):
+    update_dict = {}
+    if topic_update.name is not None:
+        update_dict['name'] = topic_update.name
+    if topic_update.notes is not None:
+        update_dict['notes'] = topic_update.notes
+
+    if not update_dict:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    result = await db.topics.find_one_and_update(
+        {"_id": topic_id},
+        {"$set": update_dict},
+        return_document=True
+    )
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Topic not found")
+
+    result.setdefault('subject_name', 'Unknown')
+    return serialize_doc(result)
 
 
 @api_router.delete("/topics/{topic_id}")
-async def delete_topic(topic_id: str):
-    try:
-        result = await db.topics.delete_one({"_id": ObjectId(topic_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        return {"message": "Topic deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def delete_topic(topic_id: ObjectId = Depends(valid_topic_id)):
+    result = await db.topics.delete_one({"_id": topic_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    return {"message": "Topic deleted successfully"}
 
 
 @api_router.post("/topics/complete-revision")
 async def complete_revision(request: CompleteRevisionRequest):
-    try:
-        topic = await db.topics.find_one({"_id": ObjectId(request.topic_id)})
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        # Update the specific revision date's completed status
-        revision_dates = topic['revision_dates']
-        for rd in revision_dates:
-            if rd['day_number'] == request.day_number:
-                rd['completed'] = True
-                break
-        
-        await db.topics.update_one(
-            {"_id": ObjectId(request.topic_id)},
-            {"$set": {"revision_dates": revision_dates}}
-        )
-        
-        return {"message": "Revision marked as completed"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # Flip the matching revision atomically with the positional operator —
+    # one round-trip, no read-modify-write race on the array
+    result = await db.topics.update_one(
+        {"_id": parse_object_id(request.topic_id), "revision_dates.day_number": request.day_number},
+        {"$set": {"revision_dates.$.completed": True}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Topic not found")
+
+    return {"message": "Revision marked as completed"}
 
 
 @api_router.get("/revisions/today")
 async def get_today_revisions():
     """Get all topics that need revision today"""
-    today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    today_end = datetime.combine(today, datetime.max.time())
-    
-    # Batch fetch all subjects to avoid N+1 queries
-    subjects = await db.subjects.find().to_list(None)
-    subjects_dict = {str(s['_id']): s['name'] for s in subjects}
-    
-    topics = await db.topics.find().to_list(1000)
-    today_revisions = []
-    
-    for topic in topics:
-        subject_name = subjects_dict.get(topic['subject_id'], 'Unknown')
-        
-        for rd in topic['revision_dates']:
-            revision_date = datetime.fromisoformat(rd['date'].replace('Z', '+00:00')) if isinstance(rd['date'], str) else rd['date']
-            if today_start <= revision_date <= today_end and not rd['completed']:
-                today_revisions.append({
-                    "id": str(topic['_id']),
-                    "topic_name": topic['name'],
-                    "subject_name": subject_name,
-                    "subject_id": topic['subject_id'],
-                    "notes": topic['notes'],
-                    "day_number": rd['day_number'],
-                    "revision_date": rd['date']
-                })
-    
-    return today_revisions
+    today_start, today_end = today_window(datetime.now(timezone.utc))
+
+    # Filter and join server-side so only matching topics cross the wire;
+    # the $elemMatch predicate is backed by the revision_dates multikey index
+    date_range = {"$gte": today_start, "$lte": today_end}
+    pipeline = [
+        {"$match": {"revision_dates": {"$elemMatch": {"date": date_range, "completed": False}}}},
+        {"$unwind": "$revision_dates"},
+        {"$match": {"revision_dates.date": date_range, "revision_dates.completed": False}},
+        {"$project": {"name": 1, "subject_id": 1, "subject_name": 1, "notes": 1, "revision_dates": 1}}
+    ]
+    topics = await db.topics.aggregate(pipeline).to_list(None)
+
+    return [revision_row(t) for t in topics]
 
 
 @api_router.get("/revisions/upcoming")
 async def get_upcoming_revisions():
     """Get upcoming revisions (grouped by topic, showing next revision date)"""
-    today = datetime.utcnow()
-    
-    # Batch fetch all subjects to avoid N+1 queries
-    subjects = await db.subjects.find().to_list(None)
-    subjects_dict = {str(s['_id']): s['name'] for s in subjects}
-    
-    topics = await db.topics.find().to_list(1000)
-    upcoming = []
-    
-    for topic in topics:
-        subject_name = subjects_dict.get(topic['subject_id'], 'Unknown')
-        
-        # Find the next incomplete revision date for this topic
-        next_revision = None
-        for rd in topic['revision_dates']:
-            if not rd['completed']:
-                revision_date = datetime.fromisoformat(rd['date'].replace('Z', '+00:00')) if isinstance(rd['date'], str) else rd['date']
-                # Only include future revisions (not today's)
-                if revision_date.date() > today.date():
-                    if next_revision is None or revision_date < datetime.fromisoformat(next_revision['date'].replace('Z', '+00:00')):
-                        next_revision = rd
-        
-        if next_revision:
-            upcoming.append({
-                "id": str(topic['_id']),
-                "topic_name": topic['name'],
-                "subject_name": subject_name,
-                "subject_id": topic['subject_id'],
-                "notes": topic['notes'],
-                "day_number": next_revision['day_number'],
-                "revision_date": next_revision['date'],
-                "created_at": topic['created_at'].isoformat()
-            })
-    
-    # Sort by revision date
-    upcoming.sort(key=lambda x: x['revision_date'])
-    return upcoming
+    _, today_end = today_window(datetime.now(timezone.utc))
+
+    # Keep only future incomplete revisions, take the earliest per topic,
+    # and join the subject — all server-side in one round-trip
+    pipeline = [
+        {"$unwind": "$revision_dates"},
+        {"$match": {"revision_dates.completed": False, "revision_dates.date": {"$gt": today_end}}},
+        {"$project": {"name": 1, "subject_id": 1, "subject_name": 1, "notes": 1, "created_at": 1, "revision_dates": 1}},
+        {"$sort": {"revision_dates.date": 1}},
+        {"$group": {"_id": "$_id", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$sort": {"revision_dates.date": 1}}
+    ]
+    topics = await db.topics.aggregate(pipeline).to_list(None)
+
+    return [revision_row(t, include_created_at=True) for t in topics]
+
+
+@api_router.get("/revisions/summary")
+async def get_revisions_summary():
+    """Get today's and upcoming revisions in one response (dashboard view)"""
+    today_start, today_end = today_window(datetime.now(timezone.utc))
+
+    # One collection pass: unwind/join once, then $facet splits the rows
+    # into today's and upcoming result sets in the same round-trip
+    pipeline = [
+        {"$unwind": "$revision_dates"},
+        {"$match": {"revision_dates.completed": False}},
+        {"$project": {"name": 1, "subject_id": 1, "subject_name": 1, "notes": 1, "created_at": 1, "revision_dates": 1}},
+        {"$facet": {
+            "today": [
+                {"$match": {"revision_dates.date": {"$gte": today_start, "$lte": today_end}}}
+            ],
+            "upcoming": [
+                {"$match": {"revision_dates.date": {"$gt": today_end}}},
+                {"$sort": {"revision_dates.date": 1}},
+                {"$group": {"_id": "$_id", "doc": {"$first": "$$ROOT"}}},
+                {"$replaceRoot": {"newRoot": "$doc"}},
+                {"$sort": {"revision_dates.date": 1}}
+            ]
+        }}
+    ]
+    facets = (await db.topics.aggregate(pipeline).to_list(None))[0]
+
+    return {
+        "today": [revision_row(t) for t in facets['today']],
+        "upcoming": [revision_row(t, include_created_at=True) for t in facets['upcoming']]
+    }
 
 
 @api_router.get("/revisions/all")
 async def get_all_revisions():
     """Get ALL revisions (past, today, and future) for calendar view"""
-    # Batch fetch all subjects to avoid N+1 queries
-    subjects = await db.subjects.find().to_list(None)
-    subjects_dict = {str(s['_id']): s['name'] for s in subjects}
-    
-    topics = await db.topics.find().to_list(1000)
+    topics = await db.topics.find(
+        projection={"name": 1, "subject_id": 1, "subject_name": 1, "notes": 1, "created_at": 1, "revision_dates": 1}
+    ).to_list(1000)
     all_revisions = []
     
     for topic in topics:
-        subject_name = subjects_dict.get(topic['subject_id'], 'Unknown')
+        subject_name = topic.get('subject_name', 'Unknown')
         
         # Include all revision dates (completed and not completed)
         for rd in topic['revision_dates']:
@@ -386,7 +444,7 @@ async def get_all_revisions():
                 "id": str(topic['_id']),
                 "topic_name": topic['name'],
                 "subject_name": subject_name,
-                "subject_id": topic['subject_id'],
+                "subject_id": str(topic['subject_id']),
                 "notes": topic['notes'],
                 "day_number": rd['day_number'],
                 "revision_date": rd['date'],
@@ -417,6 +475,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def init_db():
+    # Pure-python BSON decoding is ~10x slower than the C extension; refuse
+    # to start silently degraded
+    if not has_c():
+        raise RuntimeError(
+            "pymongo's C extensions are missing — BSON decoding would fall "
+            "back to pure Python. Reinstall pymongo with C extensions enabled."
+        )
+    logger.info("bson C extensions active")
+
+    # Pre-warm the connection pool so the first request doesn't pay for it
+    await db.command("ping")
+    # One-time migration: topics written before subject_id became an ObjectId
+    # store it as a string, which would never match the ObjectId filters
+    migrated = await db.topics.update_many(
+        {"subject_id": {"$type": "string"}},
+        [{"$set": {"subject_id": {"$toObjectId": "$subject_id"}}}]
+    )
+    if migrated.modified_count:
+        logger.info("migrated subject_id to ObjectId on %d topics", migrated.modified_count)
+    # Same for revision dates: the baseline stored them as ISO strings, which
+    # never match the BSON-datetime range predicates
+    migrated = await db.topics.update_many(
+        {"revision_dates.date": {"$type": "string"}},
+        [{"$set": {"revision_dates": {"$map": {
+            "input": "$revision_dates",
+            "as": "rd",
+            "in": {"$mergeObjects": ["$$rd", {"date": {"$toDate": "$$rd.date"}}]}
+        }}}}]
+    )
+    if migrated.modified_count:
+        logger.info("migrated revision dates to BSON datetimes on %d topics", migrated.modified_count)
+    # And backfill subject_name on topics created before it was denormalized,
+    # which would otherwise render as 'Unknown' on every read path
+    backfilled = 0
+    async for subject in db.subjects.find(projection={"name": 1}):
+        result = await db.topics.update_many(
+            {"subject_id": subject['_id'], "subject_name": {"$exists": False}},
+            {"$set": {"subject_name": subject['name']}}
+        )
+        backfilled += result.modified_count
+    if backfilled:
+        logger.info("backfilled subject_name on %d topics", backfilled)
+    # Idempotent; background=True keeps startup from blocking on existing
+    # collections
+    await db.topics.create_index(
+        [("revision_dates.date", 1), ("revision_dates.completed", 1)], background=True)
+    await db.topics.create_index([("subject_id", 1)], background=True)
+    await db.topics.create_index([("created_at", -1), ("_id", -1)], background=True)
+    await db.subjects.create_index([("created_at", -1)], background=True)
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()